@@ -1,43 +1,134 @@
 """
 Analyze the malformed JSON from the AI
 """
+import functools
+import io
+import itertools
 import json
+import os
+import re
 
-# Read the debug file
-with open('debug_ai_response.txt', 'r', encoding='utf-8') as f:
-    content = f.read()
-
-# Extract just the JSON part (between the header and footer)
-lines = content.split('\n')
-json_lines = []
-capture = False
-
-for line in lines:
-    if line.strip() == '':
-        continue
-    if line.startswith('='):
-        if capture:
-            break
-        continue
-    if 'DEBUG' in line or 'Error' in line:
-        continue
-    capture = True
-    json_lines.append(line)
-
-json_text = '\n'.join(json_lines)
-
-print("JSON TEXT:")
-print(repr(json_text[:500]))
-print("\n\n")
-
-# Try to parse
 try:
-    data = json.loads(json_text)
-    print("✅ Valid JSON!")
-    print(json.dumps(data, indent=2))
-except json.JSONDecodeError as e:
-    print(f"❌ JSONDecodeError: {e}")
-    print(f"\nCharacter at error position:")
-    error_pos = e.pos
-    print(f"Position {error_pos}: {repr(json_text[max(0, error_pos-50):error_pos+50])}")
-    print(f"                           {'~' * 50}^")
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    import simdjson  # pysimdjson
+except ImportError:  # optional speedup for the happy path
+    simdjson = None
+
+DEBUG_FILE = 'debug_ai_response.txt'
+
+# Debug noise lines around the JSON body: one bound C-level search per line
+# instead of a separate substring probe for each marker
+_is_noise = re.compile(rb'DEBUG|Error').search
+
+
+def _loads(body):
+    """Parse JSON bytes, raising json.JSONDecodeError with a precise position on failure."""
+    if simdjson:
+        try:
+            return simdjson.Parser().parse(body, True)
+        except ValueError:
+            pass  # re-parse below to get JSONDecodeError.pos for the report
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError (same doc/pos)
+    return orjson.loads(body) if orjson else json.loads(body)
+
+
+def _dumps(data):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(data, indent=2)
+
+
+# Line classes
+_SKIP, _RULE, _CONTENT = 0, 1, 2
+
+
+def _classify(line):
+    if not line.strip():
+        return _SKIP
+    if line.startswith(b'='):
+        return _RULE
+    if _is_noise(line):
+        return _SKIP
+    return _CONTENT
+
+
+def _is_body(line):
+    return _classify(line) == _CONTENT
+
+
+def _is_not_rule(line):
+    return _classify(line) != _RULE
+
+
+def _extract(lines):
+    """Lazily yield the JSON body lines (between the header and footer) from an iterable of byte lines."""
+    lines = (line.rstrip(b'\r\n') for line in lines)
+    # Skip the header up to the first body line, stop reading at the footer
+    body = itertools.takewhile(_is_not_rule, itertools.dropwhile(lambda l: not _is_body(l), lines))
+    return filter(_is_body, body)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_debug_json(path, mtime_ns, size):
+    # Read the debug file line by line as bytes, never holding the whole file
+    # in memory; only the extracted JSON body is decoded from UTF-8
+    buf = io.BytesIO()
+    with open(path, 'rb') as f:
+        for line in _extract(f):
+            if buf.tell():
+                buf.write(b'\n')
+            buf.write(line)
+    body = buf.getvalue()
+    json_text = body.decode('utf-8')
+    try:
+        return json_text, _loads(body)
+    except json.JSONDecodeError as e:
+        raise json.JSONDecodeError(e.msg, json_text, e.pos) from None
+
+
+def load_debug_json(path=DEBUG_FILE):
+    """
+    Extract and parse the JSON body of a debug dump.
+
+    Results are memoized in-process on (path, mtime, size), so an unchanged
+    dump is not re-parsed. Raises json.JSONDecodeError (with the extracted
+    text as ``e.doc``) when the body is not valid JSON.
+    """
+    st = os.stat(path)
+    return _load_debug_json(path, st.st_mtime_ns, st.st_size)
+
+
+def main():
+    try:
+        json_text, data = load_debug_json()
+    except json.JSONDecodeError as e:
+        json_text, data, error = e.doc, None, e
+    else:
+        error = None
+
+    print("JSON TEXT:")
+    print(repr(json_text[:500]))
+    print("\n\n")
+
+    if error is None:
+        print("✅ Valid JSON!")
+        print(_dumps(data))
+    else:
+        e = error
+        print(f"❌ JSONDecodeError: {e}")
+        print(f"\nCharacter at error position:")
+        # One context window around the error; the caret lands under the
+        # offending character inside the window's repr
+        lo = max(0, e.pos - 50)
+        window = json_text[lo:e.pos + 50]
+        label = f"Position {e.pos}: "
+        print(f"{label}{window!r}")
+        print(f"{' ' * len(label)}{'~' * (len(repr(window[:e.pos - lo])) - 1)}^")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+On-disk cache keyed by content hash: completed ATS analyses, upload
+fingerprints, resolved model lists.
+
+Entries are JSON files under RESUME_JUDGE_CACHE_DIR (default
+~/.cache/ai-resume-judge), written atomically so concurrent workers never
+read a partial file. Set RESUME_JUDGE_CACHE_DISABLE=1 to bypass it.
+
+Entries expire after RESUME_JUDGE_CACHE_TTL seconds (default 7 days) and the
+directory is kept under RESUME_JUDGE_CACHE_MAX_MB (default 64); store()
+prunes expired entries, then the oldest, every PRUNE_INTERVAL seconds.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("RESUME_JUDGE_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "ai-resume-judge"
+)
+MAX_AGE = float(os.getenv("RESUME_JUDGE_CACHE_TTL", str(7 * 24 * 3600)))
+MAX_BYTES = int(float(os.getenv("RESUME_JUDGE_CACHE_MAX_MB", "64")) * 1024 * 1024)
+PRUNE_INTERVAL = 60.0
+
+_last_prune = 0.0
+
+
+def enabled() -> bool:
+    return os.getenv("RESUME_JUDGE_CACHE_DISABLE", "").strip() not in ("1", "true", "yes")
+
+
+def make_key(**parts) -> str:
+    """Stable key for the given JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> str:
+    # Two-level fan-out keeps directories small
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json")
+
+
+def fetch(key: str, max_age: float | None = None) -> dict | None:
+    """
+    Cached value for key, or None when missing, older than max_age seconds
+    (at most MAX_AGE), unreadable or disabled.
+    """
+    if not enabled():
+        return None
+    max_age = MAX_AGE if max_age is None else min(max_age, MAX_AGE)
+    try:
+        with open(_path(key), "rb") as f:
+            if time.time() - os.fstat(f.fileno()).st_mtime > max_age:
+                return None
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as read_err:
+        logger.warning("Ignoring unreadable cache entry %s: %s", key, read_err)
+        return None
+
+
+def store(key: str, value: dict) -> None:
+    """Write value for key atomically (temp file + rename). Failures are logged, not raised."""
+    if not enabled():
+        return
+    path = _path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if orjson:
+                    f.write(orjson.dumps(value))
+                else:
+                    f.write(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as write_err:
+        logger.warning("Could not write cache entry %s: %s", key, write_err)
+        return
+    _maybe_prune()
+
+
+def _maybe_prune() -> None:
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = now
+    try:
+        prune()
+    except OSError as prune_err:
+        logger.warning("Cache pruning failed: %s", prune_err)
+
+
+def prune() -> None:
+    """Delete entries older than MAX_AGE, then the oldest until the cache fits MAX_BYTES."""
+    now = time.time()
+    entries = []
+    total = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+                # Leftover temp files of crashed writers count as entries too
+                if now - st.st_mtime > MAX_AGE:
+                    os.unlink(path)
+                    continue
+            except FileNotFoundError:
+                continue  # removed by another worker
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+    if total <= MAX_BYTES:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        if total <= MAX_BYTES:
+            break
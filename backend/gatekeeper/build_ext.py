@@ -0,0 +1,26 @@
+"""
+Ahead-of-time compile the JSON brace scanner used by judge.py.
+
+Run once per environment (needs numba and a C compiler):
+
+    python -m backend.gatekeeper.build_ext
+
+This writes the _json_scan extension module next to judge.py. judge.py
+imports it when present and otherwise JIT-compiles the same scanner the
+first time it is needed.
+"""
+
+import os
+
+from numba.pycc import CC
+
+from backend.gatekeeper.judge import _scan_braces_py
+
+cc = CC("_json_scan")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.export("scan_braces", "UniTuple(int64, 2)(uint8[::1])")(_scan_braces_py)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Built {cc.output_file}")
@@ -1,4 +1,3 @@
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 
@@ -8,6 +7,8 @@ api_key = os.getenv("GOOGLE_API_KEY")
 if not api_key:
     print("❌ No API Key found in .env")
 else:
+    import google.generativeai as genai  # slow to load; only needed with a key
+
     genai.configure(api_key=api_key)
     print(f"🔑 Key found: {api_key[:5]}...")
     print("\n🔍 Scanning for available models...")
@@ -0,0 +1,32 @@
+"""
+Pull the first JSON object out of a raw model response or debug dump.
+
+Used by the debug scripts in the repo root. raw_decode stops at the end of
+the first complete object, so trailing prose, a second object or a truncated
+tail after it never reach the parser.
+"""
+
+import json
+
+_DECODER = json.JSONDecoder()
+
+
+def first_json_span(text: str) -> tuple[dict, int, int]:
+    """
+    Parse the first JSON object in text, starting at the first '{'.
+
+    Returns (object, start, end) with text[start:end] being the object's
+    source. Raises ValueError when text has no '{', and json.JSONDecodeError
+    (e.doc is text, e.pos an offset into it) when the object is malformed or
+    truncated.
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found")
+    obj, end = _DECODER.raw_decode(text, start)
+    return obj, start, end
+
+
+def extract_first_json(text: str) -> dict:
+    """The first JSON object in text; see first_json_span for errors."""
+    return first_json_span(text)[0]
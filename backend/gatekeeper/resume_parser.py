@@ -4,43 +4,125 @@ Day 1: Extract and clean text from resume PDFs
 Author: Laxmikant Shukla
 """
 
-import PyPDF2
+import hashlib
+import logging
+import os
+import pymupdf
+import re
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+
+# Pages are read until this much text is collected; the analyzer only uses
+# the first ~12k characters, so long uploads stop parsing early
+MAX_PDF_CHARS = 20_000
+
+# Extracted texts kept in memory (LRU) by PDF content hash. Resume text is
+# personal data, so it is never written to disk.
+TEXT_CACHE_SIZE = 64
+_text_cache = OrderedDict()
+_text_cache_lock = threading.Lock()
+
+
+def extract_text_from_pdf(pdf_path: str, max_chars: int = MAX_PDF_CHARS) -> str:
     """
-    Extract all text from a PDF file.
+    Extract text from a PDF file, page by page.
+
+    Results are cached in memory by the file's content hash, so re-parsing
+    the same PDF costs one read and a hash.
     
     Args:
         pdf_path: Path to the PDF file
+        max_chars: Stop reading pages once this many characters are extracted
         
     Returns:
         Extracted text as a string
     """
+    if not Path(pdf_path).exists():
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            
-            num_pages = len(pdf_reader.pages)
-            print(f"📄 Found {num_pages} page(s) in PDF")
-            
-            # Extract text from each page
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                page_text = page.extract_text()
-                text += page_text + "\n"
-                print(f"   ✓ Extracted page {page_num}/{num_pages}")
-            
-            return text.strip()
+        data = Path(pdf_path).read_bytes()
+    except Exception as e:
+        raise Exception(f"Error reading PDF: {str(e)}")
+    return extract_text_from_pdf_bytes(data, max_chars)
+
+
+def extract_text_from_pdf_bytes(data: bytes, max_chars: int = MAX_PDF_CHARS) -> str:
+    """
+    Extract text from an in-memory PDF (e.g. an upload), page by page.
+
+    Shares the in-memory text cache with extract_text_from_pdf.
     
-    except FileNotFoundError:
-        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+    Args:
+        data: PDF file content
+        max_chars: Stop reading pages once this many characters are extracted
+        
+    Returns:
+        Extracted text as a string
+    """
+    try:
+        key = (hashlib.sha1(data).hexdigest(), max_chars)
+        with _text_cache_lock:
+            cached = _text_cache.get(key)
+            if cached is not None:
+                _text_cache.move_to_end(key)
+                return cached
+
+        with pymupdf.open(stream=data, filetype="pdf") as doc:
+            logger.debug("Found %d page(s) in PDF", doc.page_count)
+            parts = []
+            total = 0
+            for page in doc:
+                page_text = page.get_text("text")
+                if not page_text.strip():
+                    continue  # cover/image-only page: nothing for the analyzer
+                parts.append(page_text)
+                total += len(page_text)
+                if total > max_chars:
+                    break
+            text = "\n".join(parts).strip()
+        with _text_cache_lock:
+            _text_cache[key] = text
+            while len(_text_cache) > TEXT_CACHE_SIZE:
+                _text_cache.popitem(last=False)
+        return text
+
     except Exception as e:
         raise Exception(f"Error reading PDF: {str(e)}")
 
 
+def _extract_or_error(pdf_path: str):
+    # Worker-side wrapper: one bad PDF is reported, not raised across the pool
+    try:
+        return extract_text_from_pdf(pdf_path)
+    except Exception as e:
+        return e
+
+
+def batch_extract(paths, workers=None) -> list:
+    """
+    Extract text from several PDFs in parallel worker processes.
+    
+    Args:
+        paths: PDF file paths
+        workers: Worker processes (default: one per CPU)
+        
+    Returns:
+        List of (path, text or Exception) tuples, in input order
+    """
+    paths = list(paths)
+    if len(paths) <= 1:
+        return [(path, _extract_or_error(path)) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(zip(paths, pool.map(_extract_or_error, paths, chunksize=4)))
+
+
 def clean_text(text: str) -> str:
     """
     Clean extracted text by removing extra whitespace.
@@ -56,6 +138,22 @@ def clean_text(text: str) -> str:
     return cleaned
 
 
+# Common resume keywords per section
+_SECTION_KEYWORDS = {
+    'education': ['education', 'degree', 'university', 'college', 'b.tech', 'm.tech'],
+    'experience': ['experience', 'worked', 'intern', 'job', 'company'],
+    'skills': ['skills', 'python', 'java', 'javascript', 'react', 'django'],
+    'projects': ['project', 'built', 'developed', 'created'],
+    'contact': ['email', 'phone', 'linkedin', 'github']
+}
+_KEYWORD_SECTION = {kw: section for section, kws in _SECTION_KEYWORDS.items() for kw in kws}
+# One scan for all keywords; the zero-width lookahead reports overlapping
+# keywords too, matching plain substring checks. Run case-sensitively on
+# lowercased text: under IGNORECASE "ſ" matches "s" but "ſkills".lower() is
+# not a key
+_SECTION_KEYWORD_RE = re.compile(r"(?=(" + "|".join(map(re.escape, _KEYWORD_SECTION)) + r"))")
+
+
 def analyze_resume_structure(text: str) -> dict:
     """
     Basic analysis of resume structure.
@@ -68,25 +166,18 @@ def analyze_resume_structure(text: str) -> dict:
     """
     words = text.split()
     
-    # Common resume keywords
-    keywords = {
-        'education': ['education', 'degree', 'university', 'college', 'b.tech', 'm.tech'],
-        'experience': ['experience', 'worked', 'intern', 'job', 'company'],
-        'skills': ['skills', 'python', 'java', 'javascript', 'react', 'django'],
-        'projects': ['project', 'built', 'developed', 'created'],
-        'contact': ['email', 'phone', 'linkedin', 'github']
-    }
-    
     stats = {
         'total_chars': len(text),
         'total_words': len(words),
         'sections_found': []
     }
     
-    text_lower = text.lower()
-    for section, section_keywords in keywords.items():
-        if any(keyword in text_lower for keyword in section_keywords):
-            stats['sections_found'].append(section)
+    found = set()
+    for m in _SECTION_KEYWORD_RE.finditer(text.lower()):
+        found.add(_KEYWORD_SECTION[m.group(1)])
+        if len(found) == len(_SECTION_KEYWORDS):
+            break
+    stats['sections_found'] = [section for section in _SECTION_KEYWORDS if section in found]
     
     return stats
 
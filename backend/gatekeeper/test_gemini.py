@@ -1,5 +1,4 @@
 import os
-from google import genai
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +11,9 @@ if not api_key:
     exit()
 
 try:
+    # Imported only once there is a key to use; the SDK is slow to load
+    from google import genai
+
     # Initialize the client
     client = genai.Client(api_key=api_key)
     
@@ -7,7 +7,6 @@ import os
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from backend.gatekeeper.judge import judge_resume
 from backend.gatekeeper.resume_parser import extract_text_from_pdf
 
 # Test with uploaded PDF
@@ -24,7 +23,8 @@ try:
     print(f"✅ Extracted {len(text)} characters")
     print(f"Preview: {text[:200]}...")
     
-    # Step 2: Judge the resume
+    # Step 2: Judge the resume (the analyzer is imported only once there is text to judge)
+    from backend.gatekeeper.judge import judge_resume
     print("\n🤖 Step 2: Judging resume...")
     result = judge_resume(text, track="PRODUCT")
     
@@ -1,29 +1,42 @@
 import json
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+from backend.gatekeeper.json_extract import first_json_span
+
+
+def _dumps_pretty(data):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
 with open('debug_ai_response.txt', 'r', encoding='utf-8') as f:
     raw = f.read()
 
-# Find where JSON starts
-start = raw.find('{')
-end = raw.rfind('}') + 1
-
-if start != -1 and end != 0:
-    json_text = raw[start:end]
-    
+try:
+    data, start, end = first_json_span(raw)
+except json.JSONDecodeError as e:
+    # e.pos is an offset into raw; the failing text runs from the first '{'
+    json_text = raw[raw.find('{'):]
     with open('extracted_json.txt', 'w', encoding='utf-8') as f:
         f.write(json_text)
-    
-    try:
-        data = json.loads(json_text)
-        with open('result.txt', 'w', encoding='utf-8') as f:
-            f.write("SUCCESS\n")
-            f.write(json.dumps(data, indent=2))
-    except json.JSONDecodeError as e:
-        with open('result.txt', 'w', encoding='utf-8') as f:
-            f.write(f"ERROR: {e}\n")
-            f.write(f"Position: {e.pos}\n")
-            if e.pos < len(json_text):
-                f.write(f"Character: {repr(json_text[e.pos])}\n")
-                f.write(f"Context: {repr(json_text[max(0, e.pos-100):e.pos+100])}\n")
+    with open('result.txt', 'w', encoding='utf-8') as f:
+        f.write(f"ERROR: {e}\n")
+        f.write(f"Position: {e.pos}\n")
+        if e.pos < len(raw):
+            f.write(f"Character: {repr(raw[e.pos])}\n")
+            f.write(f"Context: {repr(raw[max(0, e.pos-100):e.pos+100])}\n")
+except ValueError:
+    pass  # no '{' in the dump
+else:
+    with open('extracted_json.txt', 'w', encoding='utf-8') as f:
+        f.write(raw[start:end])
+    with open('result.txt', 'wb') as f:
+        f.write(b"SUCCESS\n")
+        f.write(_dumps_pretty(data))
 
 print("Done - check extracted_json.txt and result.txt")
@@ -1,6 +1,20 @@
 import json
 import os
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+from backend.gatekeeper.json_extract import first_json_span
+
+
+def _dumps_pretty(data):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
 debug_file = 'debug_ai_response.txt'
 
 print(f"Looking for: {debug_file}")
@@ -16,49 +30,46 @@ try:
     
     print(f"File size: {len(raw)} characters")
     
-    # Find where JSON starts and ends
-    start = raw.find('{')
-    end = raw.rfind('}')
-    
-    if start == -1 or end == -1:
+    if '{' not in raw:
         print("No JSON found in file")
         with open('error_details.txt', 'w', encoding='utf-8') as f:
             f.write("No JSON braces found\n")
             f.write(f"File content:\n{raw}")
         exit(1)
     
-    json_text = raw[start:end+1]
-    
-    print(f"JSON extracted, length: {len(json_text)}")
-    
-    # Save extracted JSON
-    with open('extracted_json.txt', 'w', encoding='utf-8') as f:
-        f.write(json_text)
-    
-    # Try to parse
+    # Parse only the first complete object; anything after it is ignored
     try:
-        data = json.loads(json_text)
-        with open('parse_result.txt', 'w', encoding='utf-8') as f:
-            f.write("SUCCESS - JSON is valid!\n\n")
-            f.write(json.dumps(data, indent=2))
+        data, start, end = first_json_span(raw)
+        json_text = raw[start:end]
+        print(f"JSON extracted, length: {len(json_text)}")
+        with open('extracted_json.txt', 'w', encoding='utf-8') as f:
+            f.write(json_text)
+        with open('parse_result.txt', 'wb') as f:
+            f.write(b"SUCCESS - JSON is valid!\n\n")
+            f.write(_dumps_pretty(data))
         print("SUCCESS - JSON parsed!")
     except json.JSONDecodeError as e:
+        # Positions are offsets into the whole file; everything below is
+        # sliced straight out of raw rather than from a copy of the JSON tail
+        start = raw.find('{')
+        with open('extracted_json.txt', 'w', encoding='utf-8') as f:
+            f.write(raw[start:])
         with open('parse_result.txt', 'w', encoding='utf-8') as f:
             f.write(f"PARSE ERROR\n")
             f.write(f"Error: {e}\n")
             f.write(f"Line: {e.lineno}, Column: {e.colno}, Position: {e.pos}\n\n")
             
-            if e.pos < len(json_text):
+            if e.pos < len(raw):
                 start_ctx = max(0, e.pos - 100)
-                end_ctx = min(len(json_text), e.pos + 100)
+                end_ctx = min(len(raw), e.pos + 100)
                 f.write(f"Context around error:\n")
-                f.write(f"{json_text[start_ctx:e.pos]}")
+                f.write(f"{raw[start_ctx:e.pos]}")
                 f.write("<<<ERROR HERE>>>")
-                f.write(f"{json_text[e.pos:end_ctx]}\n\n")
+                f.write(f"{raw[e.pos:end_ctx]}\n\n")
                 
             # Show first few lines
             f.write(f"\nFirst 500 characters of JSON:\n")
-            f.write(json_text[:500])
+            f.write(raw[start:start + 500])
         
         print(f"PARSE ERROR - check parse_result.txt")
 
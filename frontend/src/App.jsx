@@ -118,6 +118,19 @@ function App() {
             </div>
           )}
           
+          {/* Banner for heuristic results (provider busy or unavailable) */}
+          {result.source === 'local_fallback' && (
+            <div className="error-banner">
+              <div className="error-banner-content">
+                <span className="error-icon">⚠️</span>
+                <div className="error-text">
+                  <h3>Estimated Score</h3>
+                  <p>The AI analyzer was unavailable, so this report comes from a local keyword check. {result.fallback_reason}</p>
+                </div>
+              </div>
+            </div>
+          )}
+
           {/* Overall Score & Verdict Section */}
           <div className="score-section">
             <div className="score-card main-score">
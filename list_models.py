@@ -2,7 +2,6 @@
 Quick test: List available Gemini models
 """
 import os
-from google import genai
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,18 +14,20 @@ if not api_key:
 print(f"🔑 API Key: {api_key[:10]}...")
 
 try:
+    # Imported only once there is a key to use; the SDK is slow to load
+    from google import genai
+
     client = genai.Client(api_key=api_key)
     print("\n📋 Listing all available models...\n")
     
-    models = client.models.list()
-    gemini_models = []
+    # Page through the listing once; counting re-iterated the pager
+    models = list(client.models.list())
     
     for model in models:
         print(f"  • {model.name}")
-        if 'gemini' in model.name.lower():
-            gemini_models.append(model.name)
+    gemini_models = [m.name for m in models if 'gemini' in m.name.lower()]
     
-    print(f"\n✅ Found {len(list(models))} total models")
+    print(f"\n✅ Found {len(models)} total models")
     print(f"\n🎯 Gemini models:")
     for gm in gemini_models:
         print(f"   → {gm}")
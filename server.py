@@ -1,22 +1,49 @@
+import hashlib
+import logging
 import os
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON responses
+    orjson = None
+
 # Import functions from backend modules
-from backend.gatekeeper.resume_parser import extract_text_from_pdf
-from backend.gatekeeper.judge import analyze_resume_ats
+from backend.gatekeeper.resume_parser import extract_text_from_pdf_bytes
+from backend.gatekeeper.judge import (
+    analyze_resume_ats,
+    analyze_resumes_ats_batch,
+    cached_analysis_for_source,
+    remember_source,
+)
 
 # --- 1. CONFIGURATION ---
 load_dotenv()
+# Analyzer diagnostics go through logging; LOG_LEVEL=DEBUG adds per-attempt detail
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logging.getLogger("backend.gatekeeper").setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 api_key = os.getenv("GROQ_API_KEY")
 app = Flask(__name__)
 CORS(app)  # Allow Frontend connection
 
-print(f"API Key: {'Loaded' if api_key else 'Missing'}")
 
-UPLOAD_FOLDER = 'uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() through orjson; Flask's default() still handles dates, UUIDs, etc."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+print(f"API Key: {'Loaded' if api_key else 'Missing'}")
 
 # --- 2. THE SERVER ROUTES ---
 
@@ -29,12 +56,17 @@ def analyze_resume():
     if file.filename == '':
         return jsonify({"error": "No filename"}), 400
 
-    filepath = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(filepath)
+    # A file uploaded before is answered from the analysis cache by its
+    # content hash, skipping the PDF parse and the provider
+    data = file.read()
+    digest = hashlib.sha256(data).hexdigest()
+    cached = cached_analysis_for_source(digest)
+    if cached is not None:
+        return jsonify(cached)
 
     try:
-        # Extract text from PDF
-        text = extract_text_from_pdf(filepath)
+        # Extract text from the uploaded bytes; nothing is written to disk
+        text = extract_text_from_pdf_bytes(data)
         
         if not text:
             return jsonify({
@@ -46,6 +78,7 @@ def analyze_resume():
         
         # Run the ATS Analysis
         result = analyze_resume_ats(text)
+        remember_source(digest, text)
         
         return jsonify(result)
     
@@ -58,6 +91,74 @@ def analyze_resume():
             "verdict": "ERROR"
         }), 500
 
+@app.route('/analyze_batch', methods=['POST'])
+def analyze_resume_batch():
+    files = request.files.getlist('files')
+    if not files:
+        return jsonify({"error": "No files"}), 400
+    if any(f.filename == '' for f in files):
+        return jsonify({"error": "No filename"}), 400
+
+    try:
+        # Extract every PDF not seen before, then analyze the extractable
+        # ones concurrently
+        texts = []
+        cached = []
+        digests = []
+        failures = []
+        for file in files:
+            data = file.read()
+            digest = hashlib.sha256(data).hexdigest()
+            hit = cached_analysis_for_source(digest)
+            digests.append(digest)
+            cached.append(hit)
+            failures.append(None)
+            if hit is not None:
+                texts.append(None)
+                continue
+            # An unreadable PDF gets its own error entry instead of failing
+            # the whole batch
+            try:
+                texts.append(extract_text_from_pdf_bytes(data))
+            except Exception as e:
+                print(f"Extraction Error ({file.filename}): {type(e).__name__}: {e}")
+                texts.append(None)
+                failures[-1] = str(e)
+
+        analyzed = iter(analyze_resumes_ats_batch([t for t in texts if t]))
+        results = []
+        for text, hit, digest, failure in zip(texts, cached, digests, failures):
+            if hit is not None:
+                results.append(hit)
+            elif text:
+                results.append(next(analyzed))
+                remember_source(digest, text)
+            elif failure:
+                results.append({
+                    "error": failure,
+                    "candidate_name": "Error",
+                    "overall_score": 0,
+                    "verdict": "ERROR"
+                })
+            else:
+                results.append({
+                    "error": "Could not extract text from PDF",
+                    "candidate_name": "Error",
+                    "overall_score": 0,
+                    "verdict": "ERROR"
+                })
+
+        return jsonify(results)
+
+    except Exception as e:
+        print(f"Server Error: {type(e).__name__}: {e}")
+        return jsonify({
+            "error": str(e),
+            "candidate_name": "Server Error",
+            "overall_score": 0,
+            "verdict": "ERROR"
+        }), 500
+
 if __name__ == '__main__':
     print("Entry-Level ATS Server Running on http://127.0.0.1:5000")
     app.run(debug=True, port=5000)
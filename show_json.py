@@ -1,9 +1,15 @@
+from backend.gatekeeper.json_extract import first_json_span
+
 with open('last_ai_response.txt', 'r', encoding='utf-8') as f:
     content = f.read()
 
-# Extract just the JSON
-start = content.find('{')
-json_part = content[start:]
+# Extract just the JSON: the first complete object, or everything from the
+# first '{' when it does not parse
+try:
+    _, start, end = first_json_span(content)
+    json_part = content[start:end]
+except ValueError:
+    json_part = content[content.find('{'):]
 
 print("="*70)
 print("EXTRACTED JSON:")
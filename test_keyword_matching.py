@@ -0,0 +1,67 @@
+"""
+Regression check: keyword scans must not crash or drift on non-ASCII text
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from backend.gatekeeper.judge import _local_ats_analysis
+from backend.gatekeeper.resume_parser import _SECTION_KEYWORDS, analyze_resume_structure
+
+# Characters that case-fold onto ASCII letters under IGNORECASE ("ſ" -> s, "İ" -> i)
+SAMPLES = [
+    "Jane Doe\nawſ ſkills İntern Kubernetes",
+    "JANE DOE\nINTERN at ACME, GitHub: jdoe, PYTHON, AWS",
+    "Ünïcödé Ñame\nprojeçt intérn gcp",
+]
+
+
+def _expected_score(text):
+    # The substring checks the compiled scan replaced
+    text = text.lower()
+    score = 45
+    score += 12 if "intern" in text else 0
+    score += 8 if "github" in text else 0
+    score += 8 if "project" in text else 0
+    score += 10 if any(k in text for k in ["react", "node", "python", "java", "sql", "api", "docker"]) else 0
+    score += 8 if any(k in text for k in ["leetcode", "codeforces", "dsa", "algorithm"]) else 0
+    score += 6 if any(k in text for k in ["aws", "gcp", "azure", "deploy"]) else 0
+    return max(30, min(score, 82))
+
+
+def _expected_sections(text):
+    text = text.lower()
+    return [section for section, kws in _SECTION_KEYWORDS.items() if any(kw in text for kw in kws)]
+
+
+failed = 0
+for sample in SAMPLES:
+    try:
+        score = _local_ats_analysis(sample)["overall_score"]
+    except Exception as e:
+        print(f"❌ {sample!r}: {type(e).__name__}: {e}")
+        failed += 1
+        continue
+    if score != _expected_score(sample):
+        print(f"❌ {sample!r}: score {score}, expected {_expected_score(sample)}")
+        failed += 1
+    else:
+        print(f"✅ {sample!r}: score {score}")
+
+for sample in SAMPLES:
+    try:
+        sections = analyze_resume_structure(sample)["sections_found"]
+    except Exception as e:
+        print(f"❌ structure {sample!r}: {type(e).__name__}: {e}")
+        failed += 1
+        continue
+    if sections != _expected_sections(sample):
+        print(f"❌ structure {sample!r}: {sections}, expected {_expected_sections(sample)}")
+        failed += 1
+    else:
+        print(f"✅ structure {sample!r}: {sections}")
+
+if failed:
+    print(f"\n❌ {failed} case(s) failed")
+    exit(1)
+print("\n✅ All keyword cases passed")
@@ -2,7 +2,6 @@
 Test with timeout to see if API is just slow
 """
 import os
-from google import genai
 from dotenv import load_dotenv
 import threading
 
@@ -15,6 +14,9 @@ if not api_key:
 
 print(f"🔑 API Key loaded")
 
+# Imported only once there is a key to use; the SDK is slow to load
+from google import genai
+
 client = genai.Client(api_key=api_key)
 
 print("📡 Testing simple API call...")